@@ -14,7 +14,14 @@ def select_directory(title):
     directory = filedialog.askdirectory(title=title)
     return directory if directory else None
 
-def print_stats(stats):
+def ask_yes_no(title, message):
+    root = tk.Tk()
+    root.withdraw()
+    answer = messagebox.askyesno(title, message)
+    root.destroy()
+    return answer
+
+def print_stats(stats, video_export=False):
     """Print processing statistics."""
     print("\nProcessing Statistics:")
     print(f"Total Files Processed: {stats['total_files']}")
@@ -28,11 +35,22 @@ def print_stats(stats):
         print(f"  Copied: {stats[category]['copied']}")
         if category == 'images':
             print(f"  Exported: {stats[category]['exported']}")
+            print(f"  Renditions: {stats[category]['renditions']}")
             print(f"  No EXIF: {stats[category]['no_exif']}")
+        if category == 'videos' and video_export:
+            print(f"  Posters: {stats[category]['posters']}")
+            print(f"  Proxies: {stats[category]['proxies']}")
         print(f"  Duplicates: {stats[category]['duplicates']}")
         print(f"  Skipped: {stats[category]['skipped']}")
         print(f"  Errors: {stats[category]['errors']}")
 
+def print_progress(event):
+    """Print a one-line progress summary, used when no console progress bar is shown."""
+    eta = f"{event['eta']:.0f}s" if event['eta'] is not None else '?'
+    print(f"[{event['stage']}] {event['files_done']}/{event['files_total']} files, "
+          f"{event['bytes_done'] / 2**20:.1f}/{event['bytes_total'] / 2**20:.1f} MiB, "
+          f"{event['bytes_per_sec'] / 2**20:.1f} MiB/s, ETA {eta}", flush=True)
+
 def main():
     # Set console window title
     os.system(f"title FileOrganizer-{os.getenv('OS','OSUnknown')[:3]}-{os.getenv('PROCESSOR_ARCHITECTURE','').lower()}")
@@ -50,9 +68,24 @@ def main():
     
     # Create organizer and process files
     try:
-        organizer = FileOrganizer(input_dir, output_dir)
-        stats = organizer.organize()
-        print_stats(stats)
+        video_export = ask_yes_no('Video Export',
+                                  'Generate poster frames and low-bitrate proxies for videos?\n'
+                                  'This needs FFmpeg and can take a long time.')
+        organizer = FileOrganizer(input_dir, output_dir, video_export=video_export)
+        # tqdm only draws on a console, so fall back to printed progress lines otherwise
+        on_progress = None if sys.stderr.isatty() else print_progress
+        handle = organizer.start(on_progress=on_progress, min_interval=5,
+                                 status_file=os.path.join(output_dir, 'organize_status.jsonl'))
+        # Wait in short slices: an untimed wait is not reliably interrupted by Ctrl+C on Windows
+        try:
+            while handle.wait(0.5) is None:
+                pass
+        except KeyboardInterrupt:
+            handle.cancel()
+            while handle.wait(0.5) is None:
+                pass
+        stats = handle.stats
+        print_stats(stats, video_export)
         
         # Show completion message
         root = tk.Tk()
@@ -1,3 +1,4 @@
-from .file_organizer import FileOrganizer
+from .file_organizer import FileOrganizer, OrganizeHandle
+from .progress import ProgressReporter, JsonLinesWriter
 
 __version__ = '1.0.0'
@@ -4,6 +4,7 @@ import mimetypes
 from datetime import datetime
 from pathlib import Path
 import sys
+import threading
 from tqdm import tqdm
 
 try:
@@ -14,6 +15,7 @@ try:
         AudioProcessor,
         DocumentProcessor
     )
+    from .progress import ProgressReporter, JsonLinesWriter
 except ImportError:
     # When running directly
     from processors import (
@@ -22,6 +24,10 @@ except ImportError:
         AudioProcessor,
         DocumentProcessor
     )
+    from progress import ProgressReporter, JsonLinesWriter
+
+# Processor keys mapped to their stats and progress category
+_CATEGORIES = {'image': 'images', 'video': 'videos', 'audio': 'audios', 'application': 'documents'}
 
 
 def _get_file_type(file_path):
@@ -37,15 +43,17 @@ def _get_file_type(file_path):
 
 
 class FileOrganizer:
-    def __init__(self, input_dir, output_dir):
+    def __init__(self, input_dir, output_dir, export_renditions=None, export_workers=None,
+                 video_export=False, video_export_jobs=None):
         self.input_dir = Path(input_dir)
         self.output_dir = Path(output_dir)
         self.stats = {
             'total_files': 0,
             'errors': 0,
-            'images': {'total': 0, 'copied': 0, 'exported': 0, 'no_exif': 0, 'duplicates': 0, 'skipped': 0,
+            'images': {'total': 0, 'copied': 0, 'exported': 0, 'renditions': 0, 'no_exif': 0, 'duplicates': 0,
+                       'skipped': 0, 'errors': 0},
+            'videos': {'total': 0, 'copied': 0, 'posters': 0, 'proxies': 0, 'duplicates': 0, 'skipped': 0,
                        'errors': 0},
-            'videos': {'total': 0, 'copied': 0, 'duplicates': 0, 'skipped': 0, 'errors': 0},
             'audios': {'total': 0, 'copied': 0, 'duplicates': 0, 'skipped': 0, 'errors': 0},
             'documents': {'total': 0, 'copied': 0, 'duplicates': 0, 'skipped': 0, 'errors': 0},
             'unknown': {'total': 0, 'skipped': 0}
@@ -58,10 +66,15 @@ class FileOrganizer:
         self.dedup_file = self.output_dir / 'dedup_dataset.json'
         self.dedup_data = self._load_dedup_dataset()
 
+        # Handle of the background run started with start(), if any
+        self._active_handle = None
+
         # Initialize processors
         self.processors = {
-            'image': ImageProcessor(output_dir, self.dedup_data, self.stats),
-            'video': VideoProcessor(output_dir, self.dedup_data, self.stats),
+            'image': ImageProcessor(output_dir, self.dedup_data, self.stats,
+                                    renditions=export_renditions, export_workers=export_workers),
+            'video': VideoProcessor(output_dir, self.dedup_data, self.stats,
+                                    export=video_export, export_jobs=video_export_jobs),
             'audio': AudioProcessor(output_dir, self.dedup_data, self.stats),
             'application': DocumentProcessor(output_dir, self.dedup_data, self.stats)
         }
@@ -87,34 +100,65 @@ class FileOrganizer:
 
     def _load_dedup_dataset(self):
         """Load or create deduplication dataset."""
+        dedup_data = {'images': {}, 'videos': {}, 'audios': {}, 'documents': {}, 'image_exports': {},
+                      'video_exports': {}}
         if self.dedup_file.exists():
             try:
                 with open(self.dedup_file, 'r') as f:
-                    return json.load(f)
+                    dedup_data.update(json.load(f))
             except:
-                return {'images': {}, 'videos': {}, 'audios': {}, 'documents': {}}
-        return {'images': {}, 'videos': {}, 'audios': {}, 'documents': {}}
+                pass
+        return dedup_data
 
     def _save_dedup_dataset(self):
         """Save deduplication dataset."""
         with open(self.dedup_file, 'w') as f:
             json.dump(self.dedup_data, f, indent=4)
 
-    def organize(self):
-        """Main function to organize files."""
+    def organize(self, progress=None, handle=None):
+        """Main function to organize files.
+
+        progress is an optional ProgressReporter fed as files are processed, and handle
+        an optional OrganizeHandle checked between files for pause and cancel requests.
+        """
+        progress = progress or ProgressReporter()
+        for processor in self.processors.values():
+            processor.progress = progress
+            processor.handle = handle
+        cancelled = False
+        error = None
         try:
-            iterator = list(self.input_dir.rglob('*'))
+            progress.set_stage('scanning')
+            files = []
+            totals = {}
+            for file_path in self.input_dir.rglob('*'):
+                try:
+                    if not file_path.is_file() or file_path.name.startswith('.'):
+                        continue
+                    size = file_path.stat().st_size
+                except OSError:
+                    size = 0
+                file_type = _get_file_type(file_path)
+                category = _CATEGORIES.get(file_type, 'unknown')
+                files.append((file_path, file_type, category, size))
+                total = totals.setdefault(category, {'files': 0, 'bytes': 0})
+                total['files'] += 1
+                total['bytes'] += size
+            progress.set_totals(totals)
+
             try:
                 console = sys.stderr.isatty()
             except Exception:
                 console = False
-            for file_path in tqdm(iterator, disable=not console):
+            progress.set_stage('processing')
+            for file_path, file_type, category, size in tqdm(files, disable=not console):
+                if handle is not None:
+                    handle.wait_unpaused()
+                    if handle.is_cancelled():
+                        cancelled = True
+                        break
                 try:
-                    if not file_path.is_file() or file_path.name.startswith('.'):
-                        continue
-
                     self.stats['total_files'] += 1
-                    file_type = _get_file_type(file_path)
 
                     if file_type in self.processors:
                         self.processors[file_type].process(file_path)
@@ -125,10 +169,137 @@ class FileOrganizer:
                 except Exception as e:
                     logging.error(f"Error processing file {file_path}: {str(e)}")
                     self.stats['errors'] += 1
+                progress.advance(category, size)
+
+            # Wait for background exports before recording them. A cancel arriving
+            # from here on reaches the processors directly through the handle.
+            progress.set_stage('exporting')
+            cancelled = cancelled or (handle is not None and handle.is_cancelled())
+            for processor in self.processors.values():
+                processor.close(cancel=cancelled)
+            cancelled = cancelled or (handle is not None and handle.is_cancelled())
 
+            progress.set_stage('saving')
             self._save_dedup_dataset()
 
         except Exception as e:
             logging.error(f"Error in organize: {str(e)}")
+            error = str(e)
+            for processor in self.processors.values():
+                try:
+                    processor.close(cancel=True)
+                except Exception as close_error:
+                    logging.error(f"Error closing processor: {str(close_error)}")
+
+        for processor in self.processors.values():
+            processor.progress = None
+            processor.handle = None
+        if error is not None:
+            progress.finish('failed', error=error)
+        else:
+            progress.finish('cancelled' if cancelled else 'done')
+        return self.stats
+
+    def _cancel_exports(self, handle):
+        """Drop pending background exports of all processors, if handle's run is the active one."""
+        if self._active_handle is not handle or handle.done():
+            return
+        for processor in self.processors.values():
+            processor.cancel()
+
+    def start(self, on_progress=None, status_file=None, min_interval=0.5):
+        """Run organize() on a background thread and return an OrganizeHandle.
+
+        on_progress is a callable, a queue.Queue or a list of them, receiving progress
+        events at most every min_interval seconds (and on every stage change). If
+        status_file is given, events are also appended to it as JSON lines.
+
+        Only one run may be active at a time; RuntimeError is raised otherwise.
+        """
+        if self._active_handle is not None and not self._active_handle.done():
+            raise RuntimeError("An organize run is already in progress")
+
+        listeners = on_progress if isinstance(on_progress, (list, tuple)) else [on_progress]
+        listeners = [listener for listener in listeners if listener is not None]
+        status_writer = JsonLinesWriter(status_file) if status_file else None
+        if status_writer:
+            listeners.append(status_writer)
+
+        progress = ProgressReporter(listeners, min_interval=min_interval)
+        handle = OrganizeHandle(self.stats, progress=progress, on_cancel=self._cancel_exports)
+        self._active_handle = handle
+
+        def run():
+            try:
+                self.organize(progress, handle)
+            finally:
+                if status_writer:
+                    status_writer.close()
+                handle._finished.set()
+
+        handle._thread = threading.Thread(target=run, name='file-organizer', daemon=True)
+        handle._thread.start()
+        return handle
+
+
+class OrganizeHandle:
+    """Control a background run started with FileOrganizer.start()."""
+
+    def __init__(self, stats, progress=None, on_cancel=None):
+        self.stats = stats
+        self._progress = progress
+        self._on_cancel = on_cancel
+        self._cancelled = threading.Event()
+        self._unpaused = threading.Event()
+        self._unpaused.set()
+        self._finished = threading.Event()
+        self._thread = None
+
+    def cancel(self):
+        """Stop after the current file and drop pending exports right away.
+
+        Does nothing once the run has finished.
+        """
+        if self.done():
+            return
+        self._cancelled.set()
+        if self._on_cancel is not None:
+            self._on_cancel(self)
+        # Release paused workers so they see the cancel
+        self.resume()
+
+    def pause(self):
+        """Pause before the next file and before each queued export job.
+
+        Files and export jobs already in progress finish first.
+        """
+        if self.done():
+            return
+        self._unpaused.clear()
+        if self._progress is not None:
+            self._progress.set_paused(True)
+
+    def resume(self):
+        if self.done():
+            return
+        self._unpaused.set()
+        if self._progress is not None:
+            self._progress.set_paused(False)
+
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    def is_paused(self):
+        return not self._unpaused.is_set()
+
+    def wait_unpaused(self):
+        self._unpaused.wait()
+
+    def done(self):
+        return self._finished.is_set()
 
+    def wait(self, timeout=None):
+        """Wait for the run to finish. Returns the stats, or None on timeout."""
+        if not self._finished.wait(timeout):
+            return None
         return self.stats
@@ -10,6 +10,9 @@ class BaseProcessor:
         self.output_dir = Path(output_dir)
         self.dedup_data = dedup_data
         self.stats = stats
+        # Optional ProgressReporter and OrganizeHandle, set by FileOrganizer for the duration of a run
+        self.progress = None
+        self.handle = None
 
     def _get_file_hash(self, file_path):
         """Calculate SHA-256 hash of a file."""
@@ -44,3 +47,29 @@ class BaseProcessor:
     def process(self, file_path):
         """Process a file. Must be implemented by subclasses."""
         raise NotImplementedError
+
+    def _export_queued(self, kind, count=1):
+        """Report background export jobs queued, if a progress reporter is set."""
+        if self.progress is not None:
+            self.progress.export_queued(kind, count)
+
+    def _export_done(self, kind, count=1):
+        """Report background export jobs finished, if a progress reporter is set."""
+        if self.progress is not None:
+            self.progress.export_done(kind, count)
+
+    def _wait_unpaused(self):
+        """Block background work while the run is paused."""
+        if self.handle is not None:
+            self.handle.wait_unpaused()
+
+    def cancel(self):
+        """Drop pending background work right away. Override in subclasses that defer work."""
+        pass
+
+    def close(self, cancel=False):
+        """Finish any background work, dropping pending work if cancel is set.
+
+        Override in subclasses that defer work.
+        """
+        pass
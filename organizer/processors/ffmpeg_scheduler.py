@@ -0,0 +1,153 @@
+import itertools
+import logging
+import os
+import queue
+import subprocess
+import threading
+
+# Job priorities, lower runs first
+PRIORITY_POSTER = 0
+PRIORITY_PROXY = 1
+
+
+class FFmpegJob:
+    def __init__(self, cmd, output_path, priority, timeout, on_done=None):
+        self.cmd = cmd
+        self.output_path = output_path
+        self.priority = priority
+        self.timeout = timeout
+        self.on_done = on_done
+        self.status = 'queued'
+        self._process = None
+
+    @property
+    def partial_path(self):
+        """Temporary output path, renamed into place once ffmpeg succeeds."""
+        path = self.output_path
+        return path.with_name(f"{path.stem}.partial{path.suffix}")
+
+
+class FFmpegScheduler:
+    """Run ffmpeg jobs on a bounded number of worker threads in priority order.
+
+    Each job's decoder, filters and encoder are limited to a share of the cores with
+    -threads and -filter_threads, so that the running jobs together use about as many
+    threads as there are cores. A scheduler is single-use: once closed it refuses new jobs.
+
+    wait_unpaused is an optional callable that blocks while the caller is paused; workers
+    call it before starting each job.
+    """
+
+    def __init__(self, max_jobs=None, wait_unpaused=None):
+        cpu_count = os.cpu_count() or 1
+        self.max_jobs = max_jobs or max(1, cpu_count // 2)
+        self.threads_per_job = max(1, cpu_count // self.max_jobs)
+        self.wait_unpaused = wait_unpaused
+        self._closed = False
+        self._queue = queue.PriorityQueue()
+        self._counter = itertools.count()
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._running = set()
+        self._workers = [
+            threading.Thread(target=self._worker, name=f'ffmpeg-{i}', daemon=True)
+            for i in range(self.max_jobs)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, cmd, output_path, priority, timeout=None, on_done=None):
+        """Queue an ffmpeg command writing to output_path. Returns the job."""
+        if self._closed:
+            raise RuntimeError("FFmpegScheduler is closed")
+        job = FFmpegJob(cmd, output_path, priority, timeout, on_done)
+        if self._cancelled.is_set():
+            job.status = 'cancelled'
+            if on_done:
+                on_done(job)
+            return job
+        # The counter keeps jobs of equal priority in submission order
+        self._queue.put((priority, next(self._counter), job))
+        return job
+
+    def _worker(self):
+        while True:
+            _, _, job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                if self.wait_unpaused:
+                    self.wait_unpaused()
+                if self._cancelled.is_set():
+                    job.status = 'cancelled'
+                else:
+                    self._run(job)
+                if job.on_done:
+                    job.on_done(job)
+            except Exception as e:
+                logging.error(f"Error in ffmpeg job for {job.output_path}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job):
+        """Run a single job, moving its output into place only on success."""
+        partial_path = job.partial_path
+        job.output_path.parent.mkdir(parents=True, exist_ok=True)
+        # Options right after the program name are global (-filter_threads) or apply to
+        # the first input (-threads for the decoder); the trailing -threads is the encoder's
+        threads = str(self.threads_per_job)
+        cmd = (job.cmd[:1] + ['-filter_threads', threads, '-threads', threads] + job.cmd[1:]
+               + ['-threads', threads, str(partial_path)])
+        try:
+            with self._lock:
+                if self._cancelled.is_set():
+                    job.status = 'cancelled'
+                    return
+                job._process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                                stdin=subprocess.DEVNULL)
+                self._running.add(job)
+            try:
+                _, stderr = job._process.communicate(timeout=job.timeout)
+            except subprocess.TimeoutExpired:
+                job._process.kill()
+                job._process.communicate()
+                job.status = 'timeout'
+                logging.error(f"ffmpeg timed out after {job.timeout}s: {job.output_path}")
+                return
+
+            if self._cancelled.is_set():
+                job.status = 'cancelled'
+            elif job._process.returncode != 0:
+                job.status = 'failed'
+                logging.error(f"ffmpeg failed for {job.output_path}: "
+                              f"{stderr.decode(errors='replace').strip()}")
+            else:
+                os.replace(partial_path, job.output_path)
+                job.status = 'done'
+        except Exception as e:
+            job.status = 'failed'
+            logging.error(f"Error running ffmpeg for {job.output_path}: {str(e)}")
+        finally:
+            with self._lock:
+                self._running.discard(job)
+            if partial_path.exists():
+                partial_path.unlink(missing_ok=True)
+
+    def cancel(self):
+        """Drop queued jobs and kill the running ones."""
+        self._cancelled.set()
+        with self._lock:
+            for job in self._running:
+                job._process.kill()
+
+    def close(self):
+        """Wait for all queued jobs, then stop the workers."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.join()
+        # Stop sentinels sort after every real job
+        for _ in self._workers:
+            self._queue.put((float('inf'), next(self._counter), None))
+        for worker in self._workers:
+            worker.join()
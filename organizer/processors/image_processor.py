@@ -1,16 +1,55 @@
 import logging
+import os
 import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from pathlib import Path
 
 from PIL import Image, ExifTags
 
 from .base_processor import BaseProcessor
 
 
+# Export renditions, largest first: max long edge in pixels, output format and quality
+DEFAULT_EXPORT_RENDITIONS = [
+    {'size': 3840, 'format': 'JPEG', 'quality': 90},
+    {'size': 1920, 'format': 'JPEG', 'quality': 85},
+    {'size': 512, 'format': 'WEBP', 'quality': 80},
+    {'size': 256, 'format': 'WEBP', 'quality': 75},
+]
+
+EXPORT_EXTENSIONS = {'JPEG': '.jpg', 'WEBP': '.webp'}
+
+
+def _rendition_key(rendition):
+    """Key of a rendition in the export dataset, e.g. '512-WEBP-80'."""
+    return f"{rendition['size']}-{rendition['format']}-{rendition['quality']}"
+
+
 class ImageProcessor(BaseProcessor):
-    def __init__(self, output_dir, dedup_data, stats):
+    def __init__(self, output_dir, dedup_data, stats, renditions=None, export_workers=None):
         super().__init__(output_dir, dedup_data, stats)
         self.images_dir = self.output_dir / 'Images'
+        self.renditions = sorted(
+            (dict(r, format=r.get('format', 'JPEG').upper()) for r in (renditions or DEFAULT_EXPORT_RENDITIONS)),
+            key=lambda r: r['size'], reverse=True
+        )
+        for rendition in self.renditions:
+            if rendition['format'] not in EXPORT_EXTENSIONS:
+                raise ValueError(f"Unsupported export format: {rendition['format']}")
+            rendition.setdefault('quality', 85)
+        self.dedup_data.setdefault('image_exports', {})
+
+        # Exports are decoded and encoded on a worker pool while originals are copied.
+        # The pool is created on first use and shut down by close(), once per run.
+        self._lock = threading.Lock()
+        self.export_workers = export_workers or min(4, os.cpu_count() or 1)
+        self._export_pool = None
+        # (future, number of renditions) of the exports queued in this run
+        self._export_futures = []
+        self._export_cancelled = threading.Event()
+        self._pending_exports = set()
 
     def _extract_image_metadata(self, image_path):
         """Extract EXIF metadata from image."""
@@ -64,48 +103,158 @@ class ImageProcessor(BaseProcessor):
             'no_exif': True
         }
 
-    def _export_processed_image(self, file_path, metadata):
-        """Export processed image with resizing."""
+    def _get_export_path(self, rendition, metadata, file_path):
+        """Reserve a unique export path for a rendition."""
+        dt = metadata['datetime']
+        filename_parts = [
+            f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d}",
+            f"{dt.hour:02d}-{dt.minute:02d}-{dt.second:02d}",
+            metadata['make'],
+            metadata['model'],
+            file_path.stem
+        ]
+        year_dir = f"{dt.year:04d}" if not metadata.get('no_exif') else "0000"
+
+        extension = EXPORT_EXTENSIONS[rendition['format']]
+        export_filename = '--'.join(filter(None, filename_parts)) + extension
+        export_dir = self.images_dir / 'Export' / str(rendition['size']) / year_dir
+        export_dir.mkdir(parents=True, exist_ok=True)
+
+        # Workers may export files with the same name concurrently
+        with self._lock:
+            export_path = self._get_unique_path(export_dir / export_filename)
+            export_path.touch()
+        return export_path
+
+    def _get_missing_renditions(self, file_hash):
+        """Return the configured renditions not yet exported for a file hash."""
+        exported = self.dedup_data['image_exports'].get(file_hash, {})
+        return [
+            rendition for rendition in self.renditions
+            if not (_rendition_key(rendition) in exported
+                    and Path(exported[_rendition_key(rendition)]).exists())
+        ]
+
+    def _get_stale_exports(self, file_hash, size):
+        """Return {key: path} of earlier exports of this size made with other settings."""
+        with self._lock:
+            exported = self.dedup_data['image_exports'].get(file_hash, {})
+            # Keys are '<size>-<format>-<quality>'; older datasets used '<size>' alone
+            return {key: path for key, path in exported.items() if key.split('-')[0] == str(size)}
+
+    def _export_processed_image(self, file_path, metadata, file_hash, renditions):
+        """Export all renditions of an image from a single decode."""
+        remaining = len(renditions)
+        self._wait_unpaused()
+        if self._export_cancelled.is_set():
+            self._export_done('renditions', remaining)
+            return
         try:
             with Image.open(file_path) as img:
-                # Construct filename
-                dt = metadata['datetime']
-                filename_parts = [
-                    f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d}",
-                    f"{dt.hour:02d}-{dt.minute:02d}-{dt.second:02d}",
-                    metadata['make'],
-                    metadata['model'],
-                    file_path.stem
-                ]
-                year_dir = f"{dt.year:04d}" if not metadata.get('no_exif') else "0000"
-                
-                export_filename = '--'.join(filter(None, filename_parts)) + '.jpg'
-                export_dir = self.images_dir / 'Export' / year_dir
-                export_dir.mkdir(parents=True, exist_ok=True)
-                
-                export_path = self._get_unique_path(export_dir / export_filename)
-                
-                # Convert to RGB, resize, and save with optimization
-                width, height = img.size
-                if width > 3840 or height > 2160:
-                    ratio = min(3840/width, 2160/height)
-                    width, height = (int(width * ratio), int(height * ratio))
-                
-                img.convert('RGB').resize((width, height)).save(export_path, 'JPEG', exif=img.getexif(), optimize=True)
+                # Let the decoder scale down while decoding when the format supports it
+                largest = renditions[0]['size']
+                img.draft('RGB', (largest, largest))
+                exif = img.getexif()
+                current = img.convert('RGB')
+
+            for rendition in renditions:
+                # Downscale in steps, each rendition from the previous (larger) one
+                size = rendition['size']
+                width, height = current.size
+                if width > size or height > size:
+                    ratio = min(size / width, size / height)
+                    current = current.resize(
+                        (max(1, int(width * ratio)), max(1, int(height * ratio))),
+                        Image.LANCZOS, reducing_gap=3.0
+                    )
+
+                # Overwrite an earlier export of this size in the same format in place,
+                # so changing the quality does not leave a suffixed copy next to it
+                stale = self._get_stale_exports(file_hash, size)
+                extension = EXPORT_EXTENSIONS[rendition['format']]
+                reusable = [Path(path) for path in stale.values()
+                            if Path(path).suffix == extension and Path(path).exists()]
+                export_path = reusable[0] if reusable else self._get_export_path(rendition, metadata, file_path)
+                try:
+                    current.save(export_path, rendition['format'], exif=exif,
+                                 quality=rendition['quality'], optimize=True)
+                except Exception:
+                    if not reusable:
+                        export_path.unlink(missing_ok=True)
+                    raise
+
+                # Record each rendition as soon as it is written, so a later failure
+                # does not leave it on disk unrecorded
+                with self._lock:
+                    exported = self.dedup_data['image_exports'].setdefault(file_hash, {})
+                    for key in stale:
+                        exported.pop(key, None)
+                    exported[_rendition_key(rendition)] = str(export_path)
+                    self.stats['images']['renditions'] += 1
+                # Exports of this size in another format are replaced by the new one
+                for path in stale.values():
+                    if Path(path) != export_path:
+                        Path(path).unlink(missing_ok=True)
+                remaining -= 1
+                self._export_done('renditions')
+
+            with self._lock:
                 self.stats['images']['exported'] += 1
-                
+
         except Exception as e:
             logging.error(f"Error exporting image {file_path}: {str(e)}")
-            self.stats['images']['errors'] += 1
+            with self._lock:
+                self.stats['images']['errors'] += 1
+            self._export_done('renditions', remaining)
+
+    def _schedule_export(self, file_path, metadata, file_hash):
+        """Queue missing renditions of an image on the export worker pool."""
+        # A duplicate seen in the same run must not export the same renditions twice
+        if file_hash in self._pending_exports:
+            return
+        renditions = self._get_missing_renditions(file_hash)
+        if renditions:
+            self._pending_exports.add(file_hash)
+            if self._export_pool is None:
+                self._export_pool = ThreadPoolExecutor(max_workers=self.export_workers,
+                                                       thread_name_prefix='image-export')
+            future = self._export_pool.submit(
+                self._export_processed_image, file_path, metadata, file_hash, renditions
+            )
+            self._export_futures.append((future, len(renditions)))
+            self._export_queued('renditions', len(renditions))
+
+    def cancel(self):
+        """Drop queued exports. Exports already running finish."""
+        self._export_cancelled.set()
+        for future, count in list(self._export_futures):
+            if future.cancel():
+                self._export_done('renditions', count)
+
+    def close(self, cancel=False):
+        """Wait for pending exports to finish, or drop the queued ones if cancel is set."""
+        if cancel:
+            self.cancel()
+        self._export_futures.clear()
+        if self._export_pool is not None:
+            self._export_pool.shutdown(wait=True)
+            self._export_pool = None
+        self._export_cancelled.clear()
+        self._pending_exports.clear()
 
     def process(self, file_path):
         """Process image files."""
         try:
-            self.stats['images']['total'] += 1
+            with self._lock:
+                self.stats['images']['total'] += 1
             file_hash = self._get_file_hash(file_path)
             
             if file_hash in self.dedup_data['images']:
-                self.stats['images']['duplicates'] += 1
+                with self._lock:
+                    self.stats['images']['duplicates'] += 1
+                # Fill in renditions added to the configuration since the last run
+                if file_hash not in self._pending_exports and self._get_missing_renditions(file_hash):
+                    self._schedule_export(file_path, self._extract_image_metadata(file_path), file_hash)
                 return
             
             # Extract metadata
@@ -124,13 +273,15 @@ class ImageProcessor(BaseProcessor):
             target_path = self._get_unique_path(target_dir / file_path.name)
             
             shutil.copy2(file_path, target_path)
-            self.dedup_data['images'][file_hash] = str(target_path)
-            self.stats['images']['copied'] += 1
+            with self._lock:
+                self.dedup_data['images'][file_hash] = str(target_path)
+                self.stats['images']['copied'] += 1
             
-            # Export processed version
-            self._export_processed_image(file_path, metadata)
+            # Export processed versions
+            self._schedule_export(file_path, metadata, file_hash)
             
         except Exception as e:
             logging.error(f"Error processing image {file_path}: {str(e)}")
-            self.stats['images']['errors'] += 1
-            self.stats['images']['skipped'] += 1
+            with self._lock:
+                self.stats['images']['errors'] += 1
+                self.stats['images']['skipped'] += 1
@@ -2,15 +2,35 @@ import json
 import logging
 import shutil
 import subprocess
+import threading
 from datetime import datetime
 
 from .base_processor import BaseProcessor
+from .ffmpeg_scheduler import FFmpegScheduler, PRIORITY_POSTER, PRIORITY_PROXY
+
+# Videos shorter than this (in seconds) are treated as motion photos
+MOTION_PHOTO_MAX_DURATION = 5.0
+
+# Export job timeouts in seconds; proxies get extra time per second of video
+POSTER_TIMEOUT = 60
+PROXY_TIMEOUT = 300
+PROXY_TIMEOUT_PER_SECOND = 2
 
 
 class VideoProcessor(BaseProcessor):
-    def __init__(self, output_dir, dedup_data, stats):
+    def __init__(self, output_dir, dedup_data, stats, export=False, export_jobs=None):
         super().__init__(output_dir, dedup_data, stats)
         self.videos_dir = self.output_dir / 'Videos'
+        self.export_dir = self.videos_dir / 'Export'
+
+        # Poster and proxy generation is optional and runs on an ffmpeg scheduler
+        # created on first use and closed by close(), once per run
+        self.export = export
+        self.export_jobs = export_jobs
+        self.scheduler = None
+        self._lock = threading.Lock()
+        self._pending_exports = set()
+        self.dedup_data.setdefault('video_exports', {})
 
     def _extract_video_metadata(self, video_path):
         """Extract metadata from video using ffprobe."""
@@ -84,21 +104,110 @@ class VideoProcessor(BaseProcessor):
                 'no_metadata': True
             }
 
+    def _get_export_paths(self, file_hash):
+        """Return poster and proxy paths for a video, keyed by content hash."""
+        return (self.export_dir / 'Posters' / f"{file_hash}.jpg",
+                self.export_dir / 'Proxies' / f"{file_hash}.mp4")
+
+    def _on_export_done(self, job, stat_key):
+        """Record the outcome of a poster or proxy job."""
+        with self._lock:
+            if job.status == 'done':
+                self.stats['videos'][stat_key] += 1
+            elif job.status != 'cancelled':
+                self.stats['videos']['errors'] += 1
+        self._export_done(stat_key)
+
+    def _schedule_export(self, file_path, metadata, file_hash):
+        """Queue poster and proxy generation for the outputs that do not exist yet."""
+        if file_hash in self._pending_exports:
+            return
+        self._pending_exports.add(file_hash)
+        poster_path, proxy_path = self._get_export_paths(file_hash)
+        duration = metadata['duration']
+        poster_only = 0 < duration < MOTION_PHOTO_MAX_DURATION
+        # Remember which outputs this clip gets, so re-runs can skip it without probing
+        self.dedup_data['video_exports'][file_hash] = {'duration': duration, 'poster_only': poster_only}
+        if self.scheduler is None:
+            self.scheduler = FFmpegScheduler(self.export_jobs, wait_unpaused=self._wait_unpaused)
+
+        if not poster_path.exists():
+            # Grab a frame a little way in to skip black lead-in frames
+            seek = min(1.0, duration / 2) if duration > 0 else 0
+            cmd = [
+                'ffmpeg', '-v', 'error', '-y',
+                '-ss', f"{seek:.3f}",
+                '-i', str(file_path),
+                '-frames:v', '1',
+                '-vf', "scale='min(1280,iw)':-2",
+                '-q:v', '3',
+                '-update', '1'
+            ]
+            self.scheduler.submit(cmd, poster_path, PRIORITY_POSTER, timeout=POSTER_TIMEOUT,
+                                  on_done=lambda job: self._on_export_done(job, 'posters'))
+            self._export_queued('posters')
+
+        # Motion photos only get a poster
+        if poster_only or proxy_path.exists():
+            return
+        # 8-bit 4:2:0 with even dimensions keeps the H.264 proxy playable in browsers
+        cmd = [
+            'ffmpeg', '-v', 'error', '-y',
+            '-i', str(file_path),
+            '-vf', "scale=-2:'trunc(min(480,ih)/2)*2'",
+            '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '28',
+            '-pix_fmt', 'yuv420p',
+            '-c:a', 'aac', '-b:a', '96k',
+            '-movflags', '+faststart'
+        ]
+        self.scheduler.submit(cmd, proxy_path, PRIORITY_PROXY,
+                              timeout=PROXY_TIMEOUT + duration * PROXY_TIMEOUT_PER_SECOND,
+                              on_done=lambda job: self._on_export_done(job, 'proxies'))
+        self._export_queued('proxies')
+
+    def _needs_export(self, file_hash):
+        """Check whether export is enabled and an output this clip should have is missing."""
+        if not self.export or file_hash in self._pending_exports:
+            return False
+        poster_path, proxy_path = self._get_export_paths(file_hash)
+        entry = self.dedup_data['video_exports'].get(file_hash)
+        expected = [poster_path] if entry and entry['poster_only'] else [poster_path, proxy_path]
+        return not all(path.exists() for path in expected)
+
+    def cancel(self):
+        """Drop queued poster and proxy jobs and kill the running ones."""
+        scheduler = self.scheduler
+        if scheduler is not None:
+            scheduler.cancel()
+
+    def close(self, cancel=False):
+        """Wait for queued poster and proxy jobs to finish, or cancel them."""
+        if self.scheduler is not None:
+            if cancel:
+                self.scheduler.cancel()
+            self.scheduler.close()
+            self.scheduler = None
+        self._pending_exports.clear()
+
     def process(self, file_path):
         """Process video files."""
         try:
-            self.stats['videos']['total'] += 1
+            with self._lock:
+                self.stats['videos']['total'] += 1
             file_hash = self._get_file_hash(file_path)
             
             if file_hash in self.dedup_data['videos']:
-                self.stats['videos']['duplicates'] += 1
+                with self._lock:
+                    self.stats['videos']['duplicates'] += 1
+                if self._needs_export(file_hash):
+                    self._schedule_export(file_path, self._extract_video_metadata(file_path), file_hash)
                 return
             
             # Extract video metadata
             metadata = self._extract_video_metadata(file_path)
             
             # Check if this is a motion photo (duration less than 5 seconds)
-            is_motion_photo = 0 < metadata['duration'] < 5.0
+            is_motion_photo = 0 < metadata['duration'] < MOTION_PHOTO_MAX_DURATION
 
             if is_motion_photo:
                 target_dir = self.videos_dir / 'MotionPhotos'
@@ -134,9 +243,14 @@ class VideoProcessor(BaseProcessor):
             target_path = self._get_unique_path(target_dir / new_filename)
             shutil.copy2(file_path, target_path)
             self.dedup_data['videos'][file_hash] = str(target_path)
-            self.stats['videos']['copied'] += 1
+            with self._lock:
+                self.stats['videos']['copied'] += 1
+
+            if self._needs_export(file_hash):
+                self._schedule_export(file_path, metadata, file_hash)
             
         except Exception as e:
             logging.error(f"Error processing video {file_path}: {str(e)}")
-            self.stats['videos']['errors'] += 1
-            self.stats['videos']['skipped'] += 1
+            with self._lock:
+                self.stats['videos']['errors'] += 1
+                self.stats['videos']['skipped'] += 1
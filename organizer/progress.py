@@ -0,0 +1,196 @@
+import collections
+import json
+import logging
+import queue
+import threading
+import time
+
+CATEGORIES = ['images', 'videos', 'audios', 'documents', 'unknown']
+EXPORT_KINDS = ['renditions', 'posters', 'proxies']
+TERMINAL_STAGES = ['done', 'cancelled', 'failed']
+
+
+class ProgressReporter:
+    """Track files and bytes processed per category and emit rate-limited progress events.
+
+    Background export jobs (image renditions, video posters and proxies) are tracked
+    separately as queued/done counts, since they keep running after the last file.
+
+    Events are plain dicts passed to every listener. A listener is a callable or a
+    queue.Queue; queues are fed without blocking and drop events when full, so a slow
+    consumer never stalls processing. Events are delivered in order, but callbacks may
+    run on export worker threads: a Tk window must use a queue and poll it with after().
+    """
+
+    def __init__(self, listeners=None, min_interval=0.5, window=10.0):
+        self.listeners = list(listeners or [])
+        self.min_interval = min_interval
+        self.window = window
+        self.stage = 'starting'
+        self.totals = {c: {'files': 0, 'bytes': 0} for c in CATEGORIES}
+        self.done = {c: {'files': 0, 'bytes': 0} for c in CATEGORIES}
+        self.exports = {k: {'queued': 0, 'done': 0} for k in EXPORT_KINDS}
+        self.error = None
+        self.paused = False
+        self._lock = threading.Lock()
+        # Held while an event is built and delivered, so listeners see events in order
+        self._emit_lock = threading.Lock()
+        self._start_time = time.monotonic()
+        self._last_emit = 0.0
+        # (time, files done, bytes done, exports done per kind) samples for the moving averages
+        self._samples = collections.deque([(self._start_time, 0, 0, dict.fromkeys(EXPORT_KINDS, 0))])
+
+    def set_totals(self, totals):
+        """Set the expected files and bytes per category, e.g. {'images': {'files': 2, 'bytes': 10}}."""
+        with self._lock:
+            for category, total in totals.items():
+                self.totals[category] = dict(total)
+
+    def set_stage(self, stage):
+        """Switch to a new stage and emit an event immediately."""
+        with self._lock:
+            self.stage = stage
+        self._emit(force=True)
+
+    def set_paused(self, paused):
+        """Report the run as paused (or resumed) and emit an event immediately."""
+        with self._lock:
+            self.paused = paused
+        self._emit(force=True)
+
+    def advance(self, category, nbytes):
+        """Record one processed file of the given size."""
+        with self._lock:
+            self.done[category]['files'] += 1
+            self.done[category]['bytes'] += nbytes
+        self._emit()
+
+    def export_queued(self, kind, count=1):
+        """Record export jobs of the given kind queued in the background."""
+        with self._lock:
+            self.exports[kind]['queued'] += count
+        self._emit()
+
+    def export_done(self, kind, count=1):
+        """Record export jobs of the given kind that finished, successfully or not."""
+        with self._lock:
+            self.exports[kind]['done'] += count
+        self._emit()
+
+    def finish(self, stage='done', error=None):
+        """Emit the final event, with the error message of a failed run."""
+        with self._lock:
+            self.error = error
+        self.set_stage(stage)
+
+    def snapshot(self):
+        """Build a progress event from the current state."""
+        with self._lock:
+            now = time.monotonic()
+            files_done = sum(d['files'] for d in self.done.values())
+            bytes_done = sum(d['bytes'] for d in self.done.values())
+            files_total = sum(t['files'] for t in self.totals.values())
+            bytes_total = sum(t['bytes'] for t in self.totals.values())
+
+            exports_done = {k: self.exports[k]['done'] for k in EXPORT_KINDS}
+
+            self._samples.append((now, files_done, bytes_done, exports_done))
+            while len(self._samples) > 2 and now - self._samples[0][0] > self.window:
+                self._samples.popleft()
+            first_time, first_files, first_bytes, first_exports = self._samples[0]
+            elapsed = now - first_time
+            files_per_sec = (files_done - first_files) / elapsed if elapsed > 0 else 0.0
+            bytes_per_sec = (bytes_done - first_bytes) / elapsed if elapsed > 0 else 0.0
+
+            eta = None
+            stage = self.stage
+            if stage in TERMINAL_STAGES:
+                eta = 0.0 if stage == 'done' else None
+            elif self.paused:
+                stage = 'paused'
+            elif stage == 'exporting':
+                # Only background exports remain; kinds run concurrently, so the slowest
+                # one decides. Unknown until every pending kind has finished some jobs.
+                etas = []
+                for kind in EXPORT_KINDS:
+                    remaining = self.exports[kind]['queued'] - exports_done[kind]
+                    if remaining <= 0:
+                        continue
+                    rate = (exports_done[kind] - first_exports[kind]) / elapsed if elapsed > 0 else 0.0
+                    etas.append(remaining / rate if rate > 0 else None)
+                if etas and None not in etas:
+                    eta = max(etas)
+                elif not etas:
+                    eta = 0.0
+            elif bytes_per_sec > 0:
+                # ETA of the copy stage is weighted by bytes, since copying and hashing
+                # cost scales with size
+                eta = max(0, bytes_total - bytes_done) / bytes_per_sec
+
+            return {
+                'time': time.time(),
+                'stage': stage,
+                'elapsed': now - self._start_time,
+                'files_done': files_done,
+                'files_total': files_total,
+                'bytes_done': bytes_done,
+                'bytes_total': bytes_total,
+                'files_per_sec': files_per_sec,
+                'bytes_per_sec': bytes_per_sec,
+                'eta': eta,
+                'error': self.error,
+                'exports': {k: dict(self.exports[k]) for k in EXPORT_KINDS},
+                'categories': {
+                    c: {
+                        'files_done': self.done[c]['files'],
+                        'files_total': self.totals[c]['files'],
+                        'bytes_done': self.done[c]['bytes'],
+                        'bytes_total': self.totals[c]['bytes'],
+                    }
+                    for c in CATEGORIES
+                },
+            }
+
+    def _emit(self, force=False):
+        """Send an event to all listeners unless one was sent less than min_interval ago."""
+        if not self.listeners:
+            return
+        # A rate-limited event is skipped rather than waited for while another is delivered
+        if not self._emit_lock.acquire(blocking=force):
+            return
+        try:
+            now = time.monotonic()
+            if not force and now - self._last_emit < self.min_interval:
+                return
+            self._last_emit = now
+            event = self.snapshot()
+            for listener in self.listeners:
+                try:
+                    if isinstance(listener, queue.Queue):
+                        listener.put_nowait(event)
+                    else:
+                        listener(event)
+                except queue.Full:
+                    pass
+                except Exception as e:
+                    logging.error(f"Error in progress listener: {str(e)}")
+        finally:
+            self._emit_lock.release()
+
+
+class JsonLinesWriter:
+    """Progress listener that writes each event as one JSON line to a status file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'w')
+        # Events may come from export worker threads as well as the organizer thread
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        with self._lock:
+            self._file.write(json.dumps(event) + '\n')
+            self._file.flush()
+
+    def close(self):
+        self._file.close()